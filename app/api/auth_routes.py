@@ -1,7 +1,7 @@
 from flask import Blueprint, redirect, request, current_app, jsonify, session, url_for
 from app.models import Customer, APIKey, SalesforceConnection
 from app.core.security import encrypt_token, hash_api_key, generate_api_key
-from app.services.salesforce_service import exchange_code_for_tokens, get_salesforce_user_info
+from app.services.salesforce_service import exchange_code_for_tokens, get_salesforce_user_info, get_org_id_from_token_response
 from app import db
 from config import Config
 import urllib.parse
@@ -94,11 +94,12 @@ def salesforce_callback():
         if not all([access_token, refresh_token, instance_url]):
             return jsonify({"error": "Invalid token response from Salesforce"}), 400
         
-        # 4. Get user info to identify the org
-        # The user info endpoint is based on the instance_url returned by Salesforce
-        user_info_url = f"{instance_url}/services/oauth2/userinfo"
-        user_info = get_salesforce_user_info(access_token, user_info_url)
-        salesforce_org_id = user_info.get('organization_id')
+        # 4. Identify the org from the token response's identity URL, and only
+        # fall back to the userinfo endpoint if it is missing
+        salesforce_org_id = get_org_id_from_token_response(token_response)
+        if not salesforce_org_id:
+            user_info = get_salesforce_user_info(access_token, instance_url)
+            salesforce_org_id = user_info.get('organization_id')
         
         if not salesforce_org_id:
             return jsonify({"error": "Unable to retrieve organization ID"}), 400
@@ -1,23 +1,72 @@
 from flask import Blueprint, request, jsonify, g
 from app.core.security import require_api_key
-from app.services.salesforce_service import get_salesforce_api_client
-from app.services.health_checker_service import RevenueCloudHealthChecker
+from app.services.salesforce_service import get_salesforce_api_client, refresh_salesforce_api_client
+from app.services.health_checker_service import RevenueCloudHealthChecker, CHECK_TYPES, VALID_CHECK_TYPES
 
 mcp_bp = Blueprint('mcp', __name__)
 
+# Tool definitions never change at runtime, so build them once at import
+TOOLS = [
+    {
+        "name": "revenue_cloud_health_check",
+        "description": "Perform a comprehensive health check on Salesforce Revenue Cloud configuration",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "check_types": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(CHECK_TYPES)},
+                    "description": "Specific types of checks to perform (optional, defaults to all)"
+                }
+            }
+        }
+    }
+]
+
+TOOLS_RESPONSE = {
+    "tools": TOOLS,
+    "capabilities": {
+        "tools": {
+            "listChanged": False
+        }
+    }
+}
+
 @mcp_bp.route('/health-check', methods=['POST'])
 @require_api_key
 def perform_health_check():
     """Perform a comprehensive health check on the customer's Salesforce Revenue Cloud setup."""
     try:
+        # Reject bad input before paying for a Salesforce token refresh
+        payload = request.get_json(silent=True)
+        if payload is None:
+            payload = {}
+        if not isinstance(payload, dict):
+            return jsonify({"error": "Request body must be a JSON object."}), 400
+        
+        check_types = payload.get("check_types")
+        if check_types is not None:
+            if not isinstance(check_types, list) or not all(isinstance(c, str) for c in check_types):
+                return jsonify({"error": "check_types must be a list of strings."}), 400
+            invalid = sorted(set(check_types) - VALID_CHECK_TYPES)
+            if invalid:
+                return jsonify({
+                    "error": f"Unknown check_types: {', '.join(invalid)}",
+                    "valid_check_types": list(CHECK_TYPES)
+                }), 400
+        
         # g.customer is attached by the decorator
         connection = g.customer.salesforce_connection
         if not connection:
             return jsonify({"error": "No Salesforce connection found for this customer."}), 400
 
         sf_client = get_salesforce_api_client(connection)
-        checker = RevenueCloudHealthChecker(sf_client)
-        results = checker.run_all_checks()
+        # A revoked cached session is refreshed once instead of failing every check
+        checker = RevenueCloudHealthChecker(
+            sf_client,
+            refresh_client=lambda: refresh_salesforce_api_client(connection)
+        )
+        results = checker.run_all_checks(check_types)
 
         return jsonify({
             "success": True,
@@ -35,31 +84,7 @@ def perform_health_check():
 @mcp_bp.route('/tools', methods=['GET'])
 def get_available_tools():
     """Return MCP-compliant tool definitions."""
-    tools = [
-        {
-            "name": "revenue_cloud_health_check",
-            "description": "Perform a comprehensive health check on Salesforce Revenue Cloud configuration",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "check_types": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Specific types of checks to perform (optional, defaults to all)"
-                    }
-                }
-            }
-        }
-    ]
-    
-    return jsonify({
-        "tools": tools,
-        "capabilities": {
-            "tools": {
-                "listChanged": False
-            }
-        }
-    })
+    return jsonify(TOOLS_RESPONSE)
 
 @mcp_bp.route('/status', methods=['GET'])
 @require_api_key
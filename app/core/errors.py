@@ -62,7 +62,7 @@ def register_error_handlers(app):
         if app.debug:
             response["error"]["traceback"] = traceback.format_exc()
         
-        logger.error(f"API Error: {error.message}", extra={
+        logger.error("API Error: %s", error.message, extra={
             "status_code": error.status_code,
             "path": request.path,
             "method": request.method
@@ -128,7 +128,7 @@ def register_error_handlers(app):
         if app.debug:
             response["error"]["traceback"] = traceback.format_exc()
         
-        logger.error(f"Internal Server Error: {str(error)}", extra={
+        logger.error("Internal Server Error: %s", error, extra={
             "path": request.path,
             "method": request.method
         })
@@ -150,7 +150,7 @@ def register_error_handlers(app):
             response["error"]["traceback"] = traceback.format_exc()
             response["error"]["details"] = str(error)
         
-        logger.error(f"Unexpected Error: {str(error)}", extra={
+        logger.error("Unexpected Error: %s", error, extra={
             "path": request.path,
             "method": request.method
         })
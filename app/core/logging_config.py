@@ -73,4 +73,4 @@ def setup_logging(app):
     app.logger.setLevel(getattr(logging, log_level))
     
     # Log startup message
-    app.logger.info(f"ForceWeaver MCP API starting with log level: {log_level}") 
\ No newline at end of file
+    app.logger.info("ForceWeaver MCP API starting with log level: %s", log_level) 
\ No newline at end of file
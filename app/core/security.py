@@ -1,5 +1,6 @@
 from functools import wraps
 from flask import request, abort, g
+from sqlalchemy.orm import joinedload
 from werkzeug.security import check_password_hash
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
@@ -8,13 +9,20 @@ import base64
 import secrets
 import hashlib
 import os
+import re
 import logging
 
-# Import database for APIKey queries
-from app import db
+# Models for the API key lookup
+from app.models import APIKey, Customer
 
 logger = logging.getLogger(__name__)
 
+# Fernet instance built on first use and reused for the life of the process
+_fernet = None
+
+# Shape of keys from generate_api_key (43 url-safe characters), with room to spare
+_API_KEY_PATTERN = re.compile(r'[A-Za-z0-9_-]{32,128}')
+
 def _get_encryption_key():
     """Generate or retrieve the encryption key for Salesforce tokens."""
     key = os.environ.get('ENCRYPTION_KEY')
@@ -27,18 +35,24 @@ def _get_encryption_key():
         key = key.encode()
     return key
 
+def _get_fernet():
+    """Return the cached Fernet instance, creating it on first use."""
+    global _fernet
+    if _fernet is None:
+        _fernet = Fernet(_get_encryption_key())
+    return _fernet
+
 def encrypt_token(token):
     """Encrypt a token using Fernet symmetric encryption."""
     if not token:
         return None
     
     try:
-        key = _get_encryption_key()
-        f = Fernet(key)
+        f = _get_fernet()
         encrypted_token = f.encrypt(token.encode())
         return base64.b64encode(encrypted_token).decode()
     except Exception as e:
-        logger.error(f"Error encrypting token: {e}")
+        logger.error("Error encrypting token: %s", e)
         return None
 
 def decrypt_token(encrypted_token):
@@ -47,13 +61,12 @@ def decrypt_token(encrypted_token):
         return None
     
     try:
-        key = _get_encryption_key()
-        f = Fernet(key)
+        f = _get_fernet()
         decoded_token = base64.b64decode(encrypted_token.encode())
         decrypted_token = f.decrypt(decoded_token)
         return decrypted_token.decode()
     except Exception as e:
-        logger.error(f"Error decrypting token: {e}")
+        logger.error("Error decrypting token: %s", e)
         return None
 
 def hash_api_key(api_key):
@@ -71,34 +84,39 @@ def require_api_key(f):
         try:
             auth_header = request.headers.get('Authorization')
             if not auth_header or not auth_header.startswith('Bearer '):
-                logger.warning(f"Invalid authorization header from {request.remote_addr}")
+                logger.warning("Invalid authorization header from %s", request.remote_addr)
                 abort(401, 'Authorization header is missing or invalid.')
 
             api_key_str = auth_header.split(' ')[1]
             
+            # Turn away malformed keys without hashing them or touching the database
+            if not _API_KEY_PATTERN.fullmatch(api_key_str):
+                logger.warning("Malformed API key from %s", request.remote_addr)
+                abort(401, 'Invalid API key.')
+            
             # Hash the provided API key
             hashed_key = hash_api_key(api_key_str)
             
-            # Import here to avoid circular imports
-            from app.models import APIKey
-            
-            # Find the API key in the database
-            api_key = APIKey.query.filter_by(hashed_key=hashed_key).first()
+            # Find the API key in the database, loading the customer and its
+            # Salesforce connection in the same query
+            api_key = APIKey.query.options(
+                joinedload(APIKey.customer).joinedload(Customer.salesforce_connection)
+            ).filter_by(hashed_key=hashed_key).first()
             
             if not api_key:
-                logger.warning(f"Invalid API key attempt from {request.remote_addr}")
+                logger.warning("Invalid API key attempt from %s", request.remote_addr)
                 abort(401, 'Invalid API key.')
             
             # Attach the customer to the request context
             g.customer = api_key.customer
             g.api_key = api_key
             
-            logger.info(f"API key authentication successful for customer {api_key.customer.email}")
+            logger.info("API key authentication successful for customer %s", api_key.customer.email)
             
             return f(*args, **kwargs)
             
         except Exception as e:
-            logger.error(f"API key authentication error: {e}")
+            logger.error("API key authentication error: %s", e)
             abort(401, 'Authentication failed.')
     
     return decorated_function
\ No newline at end of file
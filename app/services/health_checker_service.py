@@ -1,10 +1,68 @@
 import logging
+import threading
+from collections import Counter
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
+from simple_salesforce.exceptions import SalesforceExpiredSession
+from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Health grade for each 10-point score bucket: 0-9, 10-19, ..., 90-99, 100
+HEALTH_GRADES = ("F", "F", "F", "F", "F", "F", "D", "C", "B", "A", "A")
+
+# Selectable check types -> (result name, RevenueCloudHealthChecker method)
+CHECKS = {
+    "basic_org_info": ("Basic Organization Info", "run_basic_org_info_check"),
+    "owd_sharing": ("OWD Sharing Settings Check", "run_owd_sharing_check"),
+    "bundle_analysis": ("Bundle Analysis", "run_optimized_bundle_checks"),
+    "attribute_picklist_integrity": ("Attribute Picklist Integrity", "run_attribute_picklist_integrity_check")
+}
+
+# Check types callers may select through the health-check endpoint, in report
+# order, plus the set both the endpoint and run_all_checks validate against
+CHECK_TYPES = tuple(CHECKS)
+VALID_CHECK_TYPES = frozenset(CHECKS)
+
+# PCM objects whose Organization-Wide Default sharing is checked
+PCM_OBJECTS = (
+    'Product2', 'Catalog', 'Category', 'AttributeDefinition', 'AttributeCategory',
+    'ProductClassification', 'ProductSellingModel', 'Pricebook2', 'PricebookEntry',
+    'ProductQualificationRule', 'ProductDisqualificationRule', 'DecisionMatrix', 'ExpressionSet'
+)
+
+# The object set never changes, so the sharing settings query is built once
+OWD_SHARING_QUERY = f"""
+    SELECT QualifiedApiName, InternalSharingModel, Label
+    FROM EntityDefinition 
+    WHERE QualifiedApiName IN ({','.join(f"'{obj}'" for obj in PCM_OBJECTS)})
+"""
+
+# User-friendly text for EntityDefinition.InternalSharingModel values
+SHARING_MODEL_LABELS = {
+    'ReadWrite': 'Public Read/Write',
+    'Read': 'Public Read Only',
+    'Private': 'Private'
+}
+
+# Check result status -> status reported in the health score
+STATUS_MAP = {
+    "passed": "ok",
+    "warning": "warning",
+    "failed": "error",
+    "info": "ok"
+}
+
+# Check result status -> severity; anything else is informational
+SEVERITY_FOR_STATUS = {
+    "failed": "error",
+    "warning": "warning"
+}
+
+# Product ids per grouped attribute count query, keeping the SOQL well under its length limit
+ATTRIBUTE_COUNT_BATCH_SIZE = 200
+
 class HealthCheckResult:
     """Class to represent the result of a health check."""
     def __init__(self, check_name, status, message, details=None, severity="info"):
@@ -18,13 +76,50 @@ class HealthCheckResult:
 class RevenueCloudHealthChecker:
     """Comprehensive health checker for Salesforce Revenue Cloud configurations."""
     
-    def __init__(self, sf_client, session_id=None):
+    def __init__(self, sf_client, session_id=None, refresh_client=None):
         self.sf = sf_client
+        # Optional callable returning a client with a fresh access token, used
+        # once if Salesforce rejects the current session mid-check
+        self._refresh_client = refresh_client
+        self._client_refreshed = False
+        self._client_lock = threading.Lock()
         self.results = []
         self.session_id = session_id
         self.total_checks = 4  # org info, OWD sharing, combined bundle checks, and attribute picklist integrity
         self.current_check = 0
+        # Checks run in parallel threads; cap how many SOQL calls are in flight
+        # at once so a single health check stays under the org's concurrent API limit
+        self._sf_slots = threading.BoundedSemaphore(Config.SALESFORCE_MAX_CONCURRENCY)
         
+    def _query(self, soql):
+        """Run a SOQL query, waiting for a free Salesforce request slot."""
+        return self._call_salesforce("query", soql)
+    
+    def _query_all(self, soql):
+        """Run a SOQL query_all, waiting for a free Salesforce request slot."""
+        return self._call_salesforce("query_all", soql)
+    
+    def _call_salesforce(self, method_name, soql):
+        """Call a client query method, renewing an expired session once."""
+        with self._sf_slots:
+            sf = self.sf
+            try:
+                return getattr(sf, method_name)(soql)
+            except SalesforceExpiredSession:
+                if not self._refresh_client:
+                    raise
+                return getattr(self._renew_client(sf), method_name)(soql)
+    
+    def _renew_client(self, expired_client):
+        """Replace an expired client, sharing one renewal across all check threads."""
+        with self._client_lock:
+            if self.sf is expired_client:
+                if self._client_refreshed:
+                    raise ValueError("Salesforce session expired again after refreshing the access token")
+                self.sf = self._refresh_client()
+                self._client_refreshed = True
+            return self.sf
+    
     def update_progress(self, check_name, status="in_progress", percentage=None):
         """Update progress for the current session."""
         if self.session_id:
@@ -33,7 +128,7 @@ class RevenueCloudHealthChecker:
             
             # In a real implementation, you might store this in Redis or a database
             # For now, we'll just log it
-            logger.info(f"Progress: {check_name} - {status} ({percentage:.1f}%)")
+            logger.info("Progress: %s - %s (%.1f%%)", check_name, status, percentage)
         
     def add_result(self, check_name, status, message, details=None, severity="info"):
         """Add a health check result."""
@@ -44,10 +139,11 @@ class RevenueCloudHealthChecker:
     def get_results_summary(self):
         """Get a summary of all health check results."""
         total_checks = len(self.results)
-        passed = len([r for r in self.results if r.status == "passed"])
-        failed = len([r for r in self.results if r.status == "failed"])
-        warnings = len([r for r in self.results if r.status == "warning"])
-        info = len([r for r in self.results if r.status == "info"])
+        status_counts = Counter(r.status for r in self.results)
+        passed = status_counts["passed"]
+        failed = status_counts["failed"]
+        warnings = status_counts["warning"]
+        info = status_counts["info"]
         
         return {
             "total_checks": total_checks,
@@ -66,7 +162,7 @@ class RevenueCloudHealthChecker:
         try:
             # Get organization info
             org_query = "SELECT Id, Name, OrganizationType, InstanceName, IsSandbox, TrialExpirationDate FROM Organization LIMIT 1"
-            org_result = self.sf.query(org_query)
+            org_result = self._query(org_query)
             
             if org_result['totalSize'] > 0:
                 org_info = org_result['records'][0]
@@ -111,22 +207,8 @@ class RevenueCloudHealthChecker:
         self.update_progress("OWD Sharing Settings", "in_progress")
         
         try:
-            # PCM objects to check
-            pcm_objects = [
-                'Product2', 'Catalog', 'Category', 'AttributeDefinition', 'AttributeCategory',
-                'ProductClassification', 'ProductSellingModel', 'Pricebook2', 'PricebookEntry',
-                'ProductQualificationRule', 'ProductDisqualificationRule', 'DecisionMatrix', 'ExpressionSet'
-            ]
-            
             # Query for sharing settings
-            objects_quoted = [f"'{obj}'" for obj in pcm_objects]
-            sharing_query = f"""
-                SELECT QualifiedApiName, InternalSharingModel, Label
-                FROM EntityDefinition 
-                WHERE QualifiedApiName IN ({','.join(objects_quoted)})
-            """
-            
-            sharing_results = self.sf.query_all(sharing_query)
+            sharing_results = self._query_all(OWD_SHARING_QUERY)
             
             if sharing_results['totalSize'] == 0:
                 self.add_result(
@@ -145,7 +227,7 @@ class RevenueCloudHealthChecker:
             
             found_objects = {record['QualifiedApiName']: record for record in sharing_results['records']}
             
-            for obj in pcm_objects:
+            for obj in PCM_OBJECTS:
                 if obj in found_objects:
                     record = found_objects[obj]
                     sharing_model = record['InternalSharingModel']
@@ -161,11 +243,7 @@ class RevenueCloudHealthChecker:
                         status_text = "FAIL"
                     
                     # Map sharing model to user-friendly text
-                    sharing_display = {
-                        'ReadWrite': 'Public Read/Write',
-                        'Read': 'Public Read Only',
-                        'Private': 'Private'
-                    }.get(sharing_model, sharing_model)
+                    sharing_display = SHARING_MODEL_LABELS.get(sharing_model, sharing_model)
                     
                     details.append(f"{status_emoji} {obj}: {sharing_display} ({status_text})")
                 else:
@@ -192,7 +270,7 @@ class RevenueCloudHealthChecker:
                 status = "failed"
                 message = f"{len(failed_objects)} objects have restrictive sharing settings that may prevent access"
             
-            severity = "info" if status == "passed" else "warning" if status == "warning" else "error"
+            severity = SEVERITY_FOR_STATUS.get(status, "info")
             
             self.add_result(
                 "OWD Sharing Settings Check",
@@ -226,7 +304,7 @@ class RevenueCloudHealthChecker:
                 AND IsActive = true
             """
             
-            bundle_results = self.sf.query_all(bundle_query)
+            bundle_results = self._query_all(bundle_query)
             
             if bundle_results['totalSize'] == 0:
                 # Both checks pass with no bundles
@@ -254,7 +332,7 @@ class RevenueCloudHealthChecker:
                 WHERE ParentProductId != NULL AND ChildProductId != NULL
             """
             
-            component_results = self.sf.query_all(component_query)
+            component_results = self._query_all(component_query)
             
             # Build parent-child relationship map (used by both checks)
             parent_child_map = {}
@@ -438,7 +516,7 @@ class RevenueCloudHealthChecker:
                 status = "passed"
                 message = "All bundles are within recommended depth and component limits with no circular dependencies"
             
-            severity = "error" if status == "failed" else "warning" if status == "warning" else "info"
+            severity = SEVERITY_FOR_STATUS.get(status, "info")
             
             self.add_result(
                 "Bundle Analysis",
@@ -463,45 +541,51 @@ class RevenueCloudHealthChecker:
             error_bundles = []
             details_list = []
             
-            # Process bundles in parallel batches
-            def process_bundle(bundle):
-                bundle_id = bundle['Id']
-                bundle_name = bundle['Name']
-                
-                try:
-                    all_product_ids = self._get_all_products_in_bundle_optimized(bundle_id, parent_child_map)
-                    
-                    if not all_product_ids:
-                        return bundle_name, 0, None
-                    
-                    id_list = "','".join(all_product_ids)
-                    query = f"SELECT COUNT(Id) FROM ProductAttributeDefinition WHERE Product2Id IN ('{id_list}')"
-                    
-                    count_result = self.sf.query(query)
-                    attribute_count = count_result['totalSize']
-                    
-                    violation = None
-                    if attribute_count > 600:
-                        violation = f"Bundle '{bundle_name}' has {attribute_count} attributes, which exceeds the limit of 600."
-                    
-                    return bundle_name, attribute_count, violation
-                    
-                except Exception as e:
-                    return bundle_name, 0, f"Error processing bundle '{bundle_name}': {e}"
+            # Resolve every bundle's product tree locally, then count attributes for
+            # all of those products in a few grouped queries instead of one per bundle
+            bundle_product_ids = {
+                bundle['Id']: self._get_all_products_in_bundle_optimized(bundle['Id'], parent_child_map)
+                for bundle in bundle_products
+            }
+            all_product_ids = sorted(set().union(*bundle_product_ids.values()))
+            
+            def count_attributes(product_ids):
+                id_list = "','".join(product_ids)
+                query = (
+                    "SELECT Product2Id, COUNT(Id) total FROM ProductAttributeDefinition "
+                    f"WHERE Product2Id IN ('{id_list}') GROUP BY Product2Id"
+                )
+                return {record['Product2Id']: record['total'] for record in self._query_all(query)['records']}
+            
+            attribute_counts = {}
+            failed_products = {}
+            batches = [
+                all_product_ids[i:i + ATTRIBUTE_COUNT_BATCH_SIZE]
+                for i in range(0, len(all_product_ids), ATTRIBUTE_COUNT_BATCH_SIZE)
+            ]
             
-            # Process bundles in parallel
             with ThreadPoolExecutor(max_workers=3) as executor:
-                future_to_bundle = {executor.submit(process_bundle, bundle): bundle for bundle in bundle_products}
+                future_to_batch = {executor.submit(count_attributes, batch): batch for batch in batches}
                 
-                for future in as_completed(future_to_bundle):
-                    bundle_name, attribute_count, result = future.result()
-                    
-                    if isinstance(result, str) and result.startswith("Error"):
-                        error_bundles.append(result)
-                    else:
-                        details_list.append(f"Bundle '{bundle_name}' has {attribute_count} attribute overrides.")
-                        if result:  # violation
-                            violated_bundles.append(result)
+                for future in as_completed(future_to_batch):
+                    try:
+                        attribute_counts.update(future.result())
+                    except Exception as e:
+                        failed_products.update(dict.fromkeys(future_to_batch[future], e))
+            
+            for bundle in bundle_products:
+                bundle_name = bundle['Name']
+                product_ids = bundle_product_ids[bundle['Id']]
+                
+                errors = [failed_products[product_id] for product_id in product_ids if product_id in failed_products]
+                if errors:
+                    error_bundles.append(f"Error processing bundle '{bundle_name}': {errors[0]}")
+                    continue
+                
+                attribute_count = sum(attribute_counts.get(product_id, 0) for product_id in product_ids)
+                details_list.append(f"Bundle '{bundle_name}' has {attribute_count} attribute overrides.")
+                if attribute_count > 600:
+                    violated_bundles.append(f"Bundle '{bundle_name}' has {attribute_count} attributes, which exceeds the limit of 600.")
             
             # Determine overall status and message
             if violated_bundles or error_bundles:
@@ -709,7 +793,7 @@ class RevenueCloudHealthChecker:
                 WHERE Status = 'Active'
             """
             
-            picklist_results = self.sf.query_all(picklist_query)
+            picklist_results = self._query_all(picklist_query)
             
             if picklist_results['totalSize'] == 0:
                 self.add_result(
@@ -727,8 +811,6 @@ class RevenueCloudHealthChecker:
                 WHERE PicklistId != NULL AND IsActive = true
             """
             
-            definition_results = self.sf.query_all(definition_query)
-            
             # Query all AttributePicklistValue records
             value_query = """
                 SELECT Id, PicklistId, Abbreviation, Status, Code, IsDefault, 
@@ -737,7 +819,13 @@ class RevenueCloudHealthChecker:
                 WHERE PicklistId != NULL
             """
             
-            value_results = self.sf.query_all(value_query)
+            # The definition and value queries are independent, so run them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                definition_future = executor.submit(self._query_all, definition_query)
+                value_future = executor.submit(self._query_all, value_query)
+                
+                definition_results = definition_future.result()
+                value_results = value_future.result()
             
             # Process the data
             self._process_attribute_picklist_data(
@@ -879,7 +967,7 @@ class RevenueCloudHealthChecker:
             status = "passed"
             message = "All AttributePicklist records are properly configured and referenced"
         
-        severity = "error" if status == "failed" else "warning" if status == "warning" else "info"
+        severity = SEVERITY_FOR_STATUS.get(status, "info")
         
         self.add_result(
             "Attribute Picklist Integrity",
@@ -889,18 +977,39 @@ class RevenueCloudHealthChecker:
             severity
         )
     
-    def run_all_checks(self):
-        """Run all available health checks with optimized queries."""
+    def run_all_checks(self, check_types=None):
+        """Run the selected health checks (all by default) with optimized queries."""
+        invalid = sorted(set(check_types or ()) - VALID_CHECK_TYPES)
+        if invalid:
+            raise ValueError(f"Unknown check types: {', '.join(invalid)}")
+        
         self.results = []  # Clear previous results
         self.current_check = 0
         
         self.update_progress("Starting Health Checks", "starting", 0)
         
-        # Run individual checks
-        self.run_basic_org_info_check()
-        self.run_owd_sharing_check()
-        self.run_optimized_bundle_checks()
-        self.run_attribute_picklist_integrity_check()
+        # Run individual checks concurrently; each one is bound by Salesforce round trips
+        checks = [
+            (check_name, getattr(self, method_name))
+            for check_type, (check_name, method_name) in CHECKS.items()
+            if not check_types or check_type in check_types
+        ]
+        self.total_checks = len(checks)
+        
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            future_to_check = {executor.submit(check): check_name for check_name, check in checks}
+            
+            for future in as_completed(future_to_check):
+                try:
+                    future.result()
+                except Exception as e:
+                    # Keep one failing check from aborting the whole report
+                    self.add_result(
+                        future_to_check[future],
+                        "failed",
+                        f"Unexpected error: {str(e)}",
+                        severity="error"
+                    )
         
         self.update_progress("Health Checks Complete", "completed", 100)
         
@@ -909,9 +1018,12 @@ class RevenueCloudHealthChecker:
     
     def _calculate_health_score(self):
         """Calculate overall health score based on individual checks."""
+        # Stamp the report once; both return paths share it
+        report_timestamp = datetime.utcnow().isoformat()
+        
         if not self.results:
             return {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": report_timestamp,
                 "checks": {},
                 "overall_health": {
                     "score": 0,
@@ -928,16 +1040,8 @@ class RevenueCloudHealthChecker:
         # Convert results to the expected format
         checks = {}
         for result in self.results:
-            # Map status to expected format
-            status_map = {
-                "passed": "ok",
-                "warning": "warning", 
-                "failed": "error",
-                "info": "ok"
-            }
-            
             checks[result.check_name.lower().replace(" ", "_")] = {
-                "status": status_map.get(result.status, "error"),
+                "status": STATUS_MAP.get(result.status, "error"),
                 "message": result.message,
                 "details": {
                     "timestamp": result.timestamp.isoformat(),
@@ -946,17 +1050,18 @@ class RevenueCloudHealthChecker:
                 }
             }
         
-        # Calculate score
+        # Calculate score, tallying every status in a single pass
         total_checks = len(self.results)
-        ok_count = sum(1 for result in self.results if result.status in ["passed", "info"])
-        warning_count = sum(1 for result in self.results if result.status == "warning")
-        error_count = sum(1 for result in self.results if result.status == "failed")
+        status_counts = Counter(result.status for result in self.results)
+        ok_count = status_counts["passed"] + status_counts["info"]
+        warning_count = status_counts["warning"]
+        error_count = status_counts["failed"]
         
         # Calculate score (ok=1, warning=0.5, error=0)
         score = (ok_count + warning_count * 0.5) / total_checks * 100 if total_checks > 0 else 0
         
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": report_timestamp,
             "checks": checks,
             "overall_health": {
                 "score": round(score, 2),
@@ -972,13 +1077,4 @@ class RevenueCloudHealthChecker:
 
     def _get_health_grade(self, score):
         """Get health grade based on score."""
-        if score >= 90:
-            return "A"
-        elif score >= 80:
-            return "B"
-        elif score >= 70:
-            return "C"
-        elif score >= 60:
-            return "D"
-        else:
-            return "F"
\ No newline at end of file
+        return HEALTH_GRADES[int(min(max(score, 0), 100)) // 10]
\ No newline at end of file
@@ -2,10 +2,80 @@ from simple_salesforce import Salesforce
 from app.core.security import decrypt_token
 from config import Config
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import time
+import http.cookiejar
+
+# Shared HTTP session so token refreshes, OAuth calls and Salesforce API
+# requests reuse pooled keep-alive connections instead of a new TLS
+# handshake per call
+_http = requests.Session()
+# The session is shared by every customer's org, so never store cookies that
+# Salesforce sets for .salesforce.com and replay them to another tenant
+_http.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+# Retry transient Salesforce failures (rate limiting and 5xx) on idempotent
+# requests with jittered exponential backoff, honouring Retry-After. Every wait
+# is capped at 30s so three retries still finish inside gunicorn's 120s worker
+# timeout. The last response is returned as-is so simple_salesforce still
+# raises its usual errors.
+_retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    backoff_max=30,
+    retry_after_max=30,
+    status_forcelist=(429, 500, 502, 503, 504),
+    raise_on_status=False
+)
+_http.mount('https://', HTTPAdapter(max_retries=_retry))
+
+# Access tokens from recent refreshes, keyed by the stored (encrypted) refresh
+# token: {encrypted_refresh_token: (access_token, expires_at)}. Expired entries
+# are dropped on lookup and pruned on every store, so tokens left behind by a
+# reconnect or rotated refresh token do not linger in worker memory.
+_access_token_cache = {}
+
+def _get_cached_access_token(connection):
+    """Return a still-fresh access token for this connection, if one is cached."""
+    key = connection.encrypted_refresh_token
+    cached = _access_token_cache.get(key)
+    if cached:
+        if cached[1] > time.monotonic():
+            return cached[0]
+        _access_token_cache.pop(key, None)
+    return None
+
+def _cache_access_token(connection, access_token):
+    """Cache a freshly refreshed access token, pruning any expired entries."""
+    now = time.monotonic()
+    for key, (_, expires_at) in list(_access_token_cache.items()):
+        if expires_at <= now:
+            _access_token_cache.pop(key, None)
+    _access_token_cache[connection.encrypted_refresh_token] = (
+        access_token,
+        now + Config.SALESFORCE_TOKEN_CACHE_TTL
+    )
+
+def _build_client(connection, access_token):
+    """Build a Salesforce client for an access token on the shared HTTP session."""
+    return Salesforce(
+        instance_url=connection.instance_url,
+        session_id=access_token,
+        consumer_key=Config.SALESFORCE_CLIENT_ID,
+        consumer_secret=Config.SALESFORCE_CLIENT_SECRET,
+        session=_http
+    )
 
 def get_salesforce_api_client(connection):
     """Create a Salesforce API client using the stored connection."""
+    # Reuse a recently refreshed access token instead of a token round trip
+    access_token = _get_cached_access_token(connection)
+    if access_token:
+        return _build_client(connection, access_token)
+    
     decrypted_refresh_token = decrypt_token(connection.encrypted_refresh_token)
     
     if not decrypted_refresh_token:
@@ -21,7 +91,7 @@ def get_salesforce_api_client(connection):
             'refresh_token': decrypted_refresh_token
         }
         
-        response = requests.post(token_url, data=refresh_data)
+        response = _http.post(token_url, data=refresh_data)
         response.raise_for_status()  # This will raise an error for bad responses (4xx or 5xx)
         
         new_token_data = response.json()
@@ -30,17 +100,22 @@ def get_salesforce_api_client(connection):
         if not new_access_token:
             raise ValueError("Failed to obtain a new access token from refresh token")
 
+        _cache_access_token(connection, new_access_token)
+        
         # Step 2: Instantiate the Salesforce client with the new, valid session ID
-        sf = Salesforce(
-            instance_url=connection.instance_url,
-            session_id=new_access_token,
-            consumer_key=Config.SALESFORCE_CLIENT_ID,
-            consumer_secret=Config.SALESFORCE_CLIENT_SECRET
-        )
-        return sf
+        return _build_client(connection, new_access_token)
     except Exception as e:
         raise ValueError(f"Failed to create Salesforce client: {str(e)}")
 
+def refresh_salesforce_api_client(connection):
+    """Drop any cached access token for this connection and build a client with a fresh one.
+    
+    Call this when Salesforce rejects a cached session (e.g. it was revoked
+    before the cache TTL ran out).
+    """
+    _access_token_cache.pop(connection.encrypted_refresh_token, None)
+    return get_salesforce_api_client(connection)
+
 def exchange_code_for_tokens(authorization_code, redirect_uri, code_verifier):
     """Exchange authorization code for access and refresh tokens."""
     token_url = "https://login.salesforce.com/services/oauth2/token"
@@ -54,7 +129,7 @@ def exchange_code_for_tokens(authorization_code, redirect_uri, code_verifier):
         'code_verifier': code_verifier
     }
     
-    response = requests.post(token_url, data=data)
+    response = _http.post(token_url, data=data)
     
     if response.status_code != 200:
         raise ValueError(f"Failed to exchange code for tokens: {response.text}")
@@ -71,9 +146,20 @@ def get_salesforce_user_info(access_token, instance_url):
     # Get user ID from the access token response
     user_info_url = f"{instance_url}/services/oauth2/userinfo"
     
-    response = requests.get(user_info_url, headers=headers)
+    response = _http.get(user_info_url, headers=headers)
     
     if response.status_code != 200:
         raise ValueError(f"Failed to get user info: {response.text}")
     
-    return response.json()
\ No newline at end of file
+    return response.json()
+
+def get_org_id_from_token_response(token_response):
+    """Read the org ID from the identity URL in an OAuth token response.
+
+    Salesforce returns ``id`` as ``https://login.salesforce.com/id/<orgId>/<userId>``,
+    so the org is known without a userinfo round trip. Returns None if absent.
+    """
+    parts = (token_response.get('id') or '').rstrip('/').split('/')
+    if len(parts) >= 3 and parts[-3] == 'id':
+        return parts[-2]
+    return None
\ No newline at end of file
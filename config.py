@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
 
 load_dotenv()
 
@@ -13,14 +14,35 @@ class Config:
 
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or 'postgresql://localhost/forceweaver_mcp'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool tuning. Pool sizes are only passed when set, so SQLAlchemy's
+    # defaults apply otherwise and pools that reject them (in-memory SQLite's
+    # StaticPool) still work. Raise them only if the server runs threaded
+    # workers, and stay under the database's connection limit.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+    if os.environ.get('DB_POOL_SIZE'):
+        SQLALCHEMY_ENGINE_OPTIONS['pool_size'] = int(os.environ['DB_POOL_SIZE'])
+    if os.environ.get('DB_MAX_OVERFLOW'):
+        SQLALCHEMY_ENGINE_OPTIONS['max_overflow'] = int(os.environ['DB_MAX_OVERFLOW'])
     SALESFORCE_CLIENT_ID = os.environ.get('SALESFORCE_CLIENT_ID')
     SALESFORCE_CLIENT_SECRET = os.environ.get('SALESFORCE_CLIENT_SECRET')
     SALESFORCE_REDIRECT_URI = os.environ.get('SALESFORCE_REDIRECT_URI')
     ENCRYPTION_KEY = os.environ.get('ENCRYPTION_KEY')
+    # Maximum Salesforce API calls one health check may have in flight at once (at least 1)
+    SALESFORCE_MAX_CONCURRENCY = max(1, int(os.environ.get('SALESFORCE_MAX_CONCURRENCY', 4)))
+    # Seconds to reuse a refreshed access token; keep well under the org's session timeout
+    SALESFORCE_TOKEN_CACHE_TTL = int(os.environ.get('SALESFORCE_TOKEN_CACHE_TTL', 300))
     
     # Optional: Redis for caching (if needed)
     REDIS_URL = os.environ.get('REDIS_URL')
     
     # App configuration
     APP_NAME = "ForceWeaver MCP API"
-    APP_VERSION = "1.0.0"
\ No newline at end of file
+    APP_VERSION = "1.0.0"
+
+class ScriptConfig(Config):
+    """Configuration for short-lived CLI scripts that exit after one run."""
+    # Don't build a connection pool that will never be reused
+    SQLALCHEMY_ENGINE_OPTIONS = {'poolclass': NullPool}
@@ -3,23 +3,36 @@
 Database initialization script for ForceWeaver MCP API
 """
 
-from app import create_app, db
-from app.models import Customer, APIKey, SalesforceConnection
+from sqlalchemy import inspect
+
+def create_tables():
+    """Create all model tables. Must be called inside an app context."""
+    from app import db
+    
+    # Reflect the existing tables once and create only the missing ones in
+    # one transaction, instead of letting create_all probe each table.
+    existing = set(inspect(db.engine).get_table_names())
+    missing = [table for name, table in db.metadata.tables.items() if name not in existing]
+    if missing:
+        with db.engine.begin() as conn:
+            db.metadata.create_all(conn, tables=missing, checkfirst=False)
 
 def init_database():
     """Initialize the database with tables."""
-    app = create_app()
+    # Import the app lazily so a failing environment is reported before
+    # paying for Flask, the blueprints and the models
+    from app import create_app, db
+    from app.models import Customer, APIKey, SalesforceConnection
+    from config import ScriptConfig
+    
+    app = create_app(ScriptConfig)
     
     with app.app_context():
-        # Create all tables
-        db.create_all()
+        create_tables()
         print("Database tables created successfully!")
         
         # Print table information
-        print("\nCreated tables:")
-        print("- Customer")
-        print("- APIKey")
-        print("- SalesforceConnection")
+        print("\nCreated tables:\n" + "\n".join(f"- {table}" for table in sorted(db.metadata.tables)))
         
         print("\nDatabase initialization complete!")
 
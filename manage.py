@@ -5,15 +5,17 @@ Database management script for ForceWeaver MCP API
 
 from flask_migrate import Migrate
 from app import create_app, db
+from init_db import create_tables
+from config import ScriptConfig
 import click
 
-app = create_app()
+app = create_app(ScriptConfig)
 migrate = Migrate(app, db)
 
 @app.cli.command()
 def init_db():
     """Initialize the database."""
-    db.create_all()
+    create_tables()
     print("Database initialized!")
 
 if __name__ == '__main__':
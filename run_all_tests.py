@@ -6,8 +6,10 @@ Runs all tests in sequence to verify the complete system
 
 import os
 import sys
+import shlex
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 def run_command(command, description, timeout=120):
@@ -18,8 +20,7 @@ def run_command(command, description, timeout=120):
     
     try:
         result = subprocess.run(
-            command,
-            shell=True,
+            shlex.split(command),
             capture_output=True,
             text=True,
             timeout=timeout
@@ -45,6 +46,22 @@ def run_command(command, description, timeout=120):
         print(f"❌ {description}: ERROR - {e}")
         return False
 
+def probe_command(command, timeout=10):
+    """Run a command quietly and return (success, last line of output)"""
+    try:
+        result = subprocess.run(
+            shlex.split(command),
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        output = (result.stdout or result.stderr).strip()
+        return result.returncode == 0, output.splitlines()[-1] if output else ""
+    except subprocess.TimeoutExpired:
+        return False, f"TIMEOUT ({timeout}s)"
+    except Exception as e:
+        return False, f"ERROR - {e}"
+
 def check_dependencies():
     """Check if all required dependencies are installed"""
     print("🔍 Checking Dependencies")
@@ -58,12 +75,17 @@ def check_dependencies():
         ("Requests", "python -c 'import requests; print(f\"Requests {requests.__version__}\")'"),
     ]
     
+    # Probe all dependencies concurrently, then report them in order
+    with ThreadPoolExecutor(max_workers=len(dependencies)) as executor:
+        results = list(executor.map(lambda dep: probe_command(dep[1], timeout=10), dependencies))
+    
     missing = []
     
-    for name, command in dependencies:
-        if run_command(command, f"Checking {name}", timeout=10):
-            pass
+    for (name, _), (ok, output) in zip(dependencies, results):
+        if ok:
+            print(f"✅ {name}: {output}")
         else:
+            print(f"❌ {name}: {output}")
             missing.append(name)
     
     if missing:
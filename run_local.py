@@ -75,44 +75,47 @@ def initialize_database():
 
 def show_startup_info():
     """Show startup information and testing instructions"""
-    print("\n" + "=" * 60)
-    print("🚀 ForceWeaver MCP API - Local Development Server")
-    print("=" * 60)
-    print("📍 Server URL: http://localhost:5000")
-    print("📖 API Documentation: http://localhost:5000/")
-    print("🏥 Health Check: http://localhost:5000/health")
-    print("🔧 MCP Tools: http://localhost:5000/api/mcp/tools")
+    # Emit the whole banner with a single write rather than one per line
+    print("\n".join([
+        "\n" + "=" * 60,
+        "🚀 ForceWeaver MCP API - Local Development Server",
+        "=" * 60,
+        "📍 Server URL: http://localhost:5000",
+        "📖 API Documentation: http://localhost:5000/",
+        "🏥 Health Check: http://localhost:5000/health",
+        "🔧 MCP Tools: http://localhost:5000/api/mcp/tools",
     
-    print("\n📋 Available Endpoints:")
-    print("   GET  /                          - API information")
-    print("   GET  /health                    - Health check")
-    print("   GET  /api/mcp/tools             - MCP tool definitions")
-    print("   GET  /api/mcp/status            - Service status (auth required)")
-    print("   POST /api/mcp/health-check      - Revenue Cloud health check (auth required)")
-    print("   GET  /api/auth/salesforce/initiate - Start OAuth flow")
-    print("   GET  /api/auth/customer/status  - Check customer status")
+        "\n📋 Available Endpoints:",
+        "   GET  /                          - API information",
+        "   GET  /health                    - Health check",
+        "   GET  /api/mcp/tools             - MCP tool definitions",
+        "   GET  /api/mcp/status            - Service status (auth required)",
+        "   POST /api/mcp/health-check      - Revenue Cloud health check (auth required)",
+        "   GET  /api/auth/salesforce/initiate - Start OAuth flow",
+        "   GET  /api/auth/customer/status  - Check customer status",
     
-    print("\n🧪 Testing Commands:")
-    print("   # Basic endpoints")
-    print("   curl http://localhost:5000/health")
-    print("   curl http://localhost:5000/api/mcp/tools")
-    print("")
-    print("   # Authenticated endpoints (use API key from above)")
-    print("   curl -H 'Authorization: Bearer YOUR_API_KEY' \\")
-    print("        http://localhost:5000/api/mcp/status")
-    print("")
-    print("   curl -X POST \\")
-    print("        -H 'Authorization: Bearer YOUR_API_KEY' \\")
-    print("        -H 'Content-Type: application/json' \\")
-    print("        http://localhost:5000/api/mcp/health-check")
+        "\n🧪 Testing Commands:",
+        "   # Basic endpoints",
+        "   curl http://localhost:5000/health",
+        "   curl http://localhost:5000/api/mcp/tools",
+        "",
+        "   # Authenticated endpoints (use API key from above)",
+        "   curl -H 'Authorization: Bearer YOUR_API_KEY' \\",
+        "        http://localhost:5000/api/mcp/status",
+        "",
+        "   curl -X POST \\",
+        "        -H 'Authorization: Bearer YOUR_API_KEY' \\",
+        "        -H 'Content-Type: application/json' \\",
+        "        http://localhost:5000/api/mcp/health-check",
     
-    print("\n📚 Additional Testing:")
-    print("   python test_local.py            - Run unit tests")
-    print("   python test_integration.py      - Run integration tests")
-    print("   python run_all_tests.py         - Run all tests")
+        "\n📚 Additional Testing:",
+        "   python test_local.py            - Run unit tests",
+        "   python test_integration.py      - Run integration tests",
+        "   python run_all_tests.py         - Run all tests",
     
-    print("\n⚠️  Press Ctrl+C to stop the server")
-    print("=" * 60)
+        "\n⚠️  Press Ctrl+C to stop the server",
+        "=" * 60
+    ]))
 
 def run_server():
     """Run the development server"""
@@ -26,6 +26,7 @@ def setup_test_data():
         from app import create_app, db
         from app.models import Customer, APIKey, SalesforceConnection
         from app.core.security import generate_api_key, hash_api_key, encrypt_token
+        from sqlalchemy.orm import joinedload
         
         app = create_app()
         
@@ -60,11 +61,21 @@ def setup_test_data():
             
             created_customers = []
             
+            # Fetch existing test customers, with their API keys and
+            # Salesforce connections, in a single query
+            existing_customers = {
+                customer.email: customer
+                for customer in Customer.query.options(
+                    joinedload(Customer.api_key),
+                    joinedload(Customer.salesforce_connection)
+                ).filter(Customer.email.in_([c['email'] for c in test_customers])).all()
+            }
+            
             for customer_data in test_customers:
                 print(f"\n👤 Creating customer: {customer_data['email']}")
                 
                 # Check if customer already exists
-                existing_customer = Customer.query.filter_by(email=customer_data['email']).first()
+                existing_customer = existing_customers.get(customer_data['email'])
                 if existing_customer:
                     print(f"   ⚠️  Customer already exists (ID: {existing_customer.id})")
                     customer = existing_customer
@@ -5,11 +5,22 @@ This script verifies that both authentication layers are working correctly.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
+# One pooled session for every probe so requests to the same host reuse the
+# TLS connection; idempotent GETs retry briefly on transient failures
+session = requests.Session()
+session.headers["User-Agent"] = "forceweaver-auth-test"
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.2))
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
+
 def test_authentication_system():
     """Test the complete dual authentication system."""
     
@@ -24,7 +35,7 @@ def test_authentication_system():
     # Test 1: Health endpoint (no auth required)
     print("\n1️⃣ Testing Basic Health Endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=10)
+        response = session.get(f"{BASE_URL}/health", timeout=10)
         if response.status_code == 200:
             print("✅ Basic health check: PASSED")
         else:
@@ -36,7 +47,7 @@ def test_authentication_system():
     # Test 2: MCP tools endpoint (no auth required)
     print("\n2️⃣ Testing MCP Tools Endpoint...")
     try:
-        response = requests.get(f"{BASE_URL}/api/mcp/tools", timeout=10)
+        response = session.get(f"{BASE_URL}/api/mcp/tools", timeout=10)
         if response.status_code == 200:
             tools = response.json().get('tools', [])
             print(f"✅ MCP tools endpoint: PASSED ({len(tools)} tools available)")
@@ -62,7 +73,7 @@ def test_authentication_system():
                 print("   Please visit this URL to complete Salesforce OAuth flow")
                 
                 # Check customer status
-                status_response = requests.get(f"{BASE_URL}/api/auth/customer/status?email={customer_email}")
+                status_response = session.get(f"{BASE_URL}/api/auth/customer/status?email={customer_email}", timeout=10)
                 if status_response.status_code == 200:
                     status_data = status_response.json()
                     print(f"📊 Customer Status: {status_data}")
@@ -77,7 +88,7 @@ def test_authentication_system():
     headers = {"Authorization": f"Bearer {api_key}"}
     
     try:
-        response = requests.get(f"{BASE_URL}/api/mcp/status", headers=headers, timeout=10)
+        response = session.get(f"{BASE_URL}/api/mcp/status", headers=headers, timeout=10)
         if response.status_code == 200:
             data = response.json()
             print("✅ API Key Authentication: PASSED")
@@ -105,7 +116,7 @@ def test_authentication_system():
     print("\n4️⃣ Testing Salesforce OAuth Authentication...")
     
     try:
-        response = requests.post(f"{BASE_URL}/api/mcp/health-check", headers=headers, timeout=30)
+        response = session.post(f"{BASE_URL}/api/mcp/health-check", headers=headers, timeout=30)
         if response.status_code == 200:
             data = response.json()
             print("✅ Salesforce OAuth Authentication: PASSED")
@@ -146,21 +157,23 @@ def test_authentication_system():
             ("/api/mcp/health-check", "POST", headers)
         ]
         
-        working_endpoints = 0
         total_endpoints = len(endpoints)
         
-        for endpoint, method, req_headers in endpoints:
+        def probe(endpoint, method, req_headers):
             try:
                 if method == "GET":
-                    resp = requests.get(f"{BASE_URL}{endpoint}", headers=req_headers, timeout=10)
+                    resp = session.get(f"{BASE_URL}{endpoint}", headers=req_headers, timeout=10)
                 else:
-                    resp = requests.post(f"{BASE_URL}{endpoint}", headers=req_headers, timeout=30)
+                    resp = session.post(f"{BASE_URL}{endpoint}", headers=req_headers, timeout=30)
                 
-                if resp.status_code == 200:
-                    working_endpoints += 1
+                return resp.status_code == 200
                     
             except Exception:
-                pass
+                return False
+        
+        # The probes are independent, so run them at once instead of back to back
+        with ThreadPoolExecutor(max_workers=total_endpoints) as executor:
+            working_endpoints = sum(executor.map(lambda args: probe(*args), endpoints))
         
         health_percentage = (working_endpoints / total_endpoints) * 100
         print(f"📊 System Health: {health_percentage:.1f}% ({working_endpoints}/{total_endpoints} endpoints working)")
@@ -307,12 +307,29 @@ class TestForceWeaverMCPAPI(unittest.TestCase):
         checker.run_owd_sharing_check()
         self.assertEqual(len(checker.results), 2)
         print("✅ OWD sharing check works")
+        
+        # Test running all checks, with one check raising unexpectedly
+        with patch.object(checker, 'run_attribute_picklist_integrity_check', side_effect=RuntimeError("boom")):
+            results = checker.run_all_checks()
+        self.assertIn('basic_organization_info', results['checks'])
+        self.assertIn('owd_sharing_settings_check', results['checks'])
+        self.assertEqual(results['checks']['attribute_picklist_integrity']['status'], 'error')
+        print("✅ All checks run and failures are isolated")
+        
+        # Test running a subset of checks
+        results = checker.run_all_checks(['basic_org_info'])
+        self.assertEqual(list(results['checks']), ['basic_organization_info'])
+        print("✅ Selected check types run on their own")
+        
+        # Unknown names are rejected rather than running nothing
+        with self.assertRaises(ValueError):
+            checker.run_all_checks(['bogus'])
     
     def test_09_oauth_flow_mocking(self):
         """Test 9: OAuth flow with mocking"""
         print("\n🧪 Test 9: OAuth Flow (Mocked)")
         
-        with patch('app.services.salesforce_service.requests.post') as mock_post:
+        with patch('app.services.salesforce_service._http.post') as mock_post:
             # Mock token exchange response
             mock_post.return_value.status_code = 200
             mock_post.return_value.json.return_value = {
@@ -407,6 +424,168 @@ class TestForceWeaverMCPAPI(unittest.TestCase):
         self.assertIn('description', tool)
         self.assertIn('inputSchema', tool)
         print("✅ MCP compliance verified")
+    
+    def test_13_health_grade(self):
+        """Test 13: Health grade boundaries"""
+        print("\n🧪 Test 13: Health Grade")
+        
+        from app.services.health_checker_service import RevenueCloudHealthChecker
+        
+        checker = RevenueCloudHealthChecker(Mock())
+        expected = {
+            100: "A", 90: "A", 89.99: "B", 80: "B", 79.5: "C", 70: "C",
+            69.9: "D", 60: "D", 59.99: "F", 0: "F", -5: "F", 150: "A"
+        }
+        for score, grade in expected.items():
+            self.assertEqual(checker._get_health_grade(score), grade, f"score {score}")
+        print("✅ Health grades match score thresholds")
+    
+    def test_14_check_type_validation(self):
+        """Test 14: Health check input validation"""
+        print("\n🧪 Test 14: Check Type Validation")
+        
+        from app.core.security import generate_api_key, hash_api_key
+        
+        customer = self.Customer(email="checks@example.com")
+        self.db.session.add(customer)
+        self.db.session.flush()
+        
+        api_key_value = generate_api_key()
+        self.db.session.add(self.APIKey(hashed_key=hash_api_key(api_key_value), customer_id=customer.id))
+        self.db.session.commit()
+        
+        headers = {'Authorization': f'Bearer {api_key_value}'}
+        
+        # Unknown check types are rejected before any Salesforce call
+        with patch('app.api.mcp_routes.get_salesforce_api_client') as mock_client:
+            response = self.client.post('/api/mcp/health-check', headers=headers,
+                                        json={'check_types': ['basic_org_info', 'bogus']})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('bogus', json.loads(response.data)['error'])
+            
+            response = self.client.post('/api/mcp/health-check', headers=headers,
+                                        json={'check_types': 'basic_org_info'})
+            self.assertEqual(response.status_code, 400)
+            
+            # JSON bodies that are not objects are rejected the same way
+            for body in (['basic_org_info'], 'x'):
+                response = self.client.post('/api/mcp/health-check', headers=headers, json=body)
+                self.assertEqual(response.status_code, 400)
+            mock_client.assert_not_called()
+        print("✅ Invalid check types rejected")
+    
+    def test_15_attribute_override_counts(self):
+        """Test 15: Attribute override counts are summed per bundle"""
+        print("\n🧪 Test 15: Attribute Override Counts")
+        
+        from app.services.health_checker_service import RevenueCloudHealthChecker
+        
+        mock_sf_client = Mock()
+        mock_sf_client.query_all.return_value = {
+            'totalSize': 2,
+            'records': [
+                {'Product2Id': 'B1', 'total': 400},
+                {'Product2Id': 'C1', 'total': 250}
+            ]
+        }
+        
+        checker = RevenueCloudHealthChecker(mock_sf_client)
+        bundles = [{'Id': 'B1', 'Name': 'Big Bundle'}, {'Id': 'B2', 'Name': 'Small Bundle'}]
+        parent_child_map = {
+            'B1': [{'ParentProductId': 'B1', 'ChildProductId': 'C1'}],
+            'B2': [{'ParentProductId': 'B2', 'ChildProductId': 'C1'}]
+        }
+        checker._process_attribute_override_check(bundles, parent_child_map)
+        
+        # One grouped query covers every product in every bundle
+        mock_sf_client.query_all.assert_called_once()
+        result = checker.results[0]
+        self.assertEqual(result.status, 'failed')
+        self.assertIn("   • Bundle 'Big Bundle' has 650 attribute overrides.", result.details)
+        self.assertIn("   • Bundle 'Small Bundle' has 250 attribute overrides.", result.details)
+        print("✅ Attribute counts fetched in one grouped query")
+    
+    def test_16_access_token_cache(self):
+        """Test 16: Refreshed access tokens are reused"""
+        print("\n🧪 Test 16: Access Token Cache")
+        
+        from app.services import salesforce_service
+        
+        mock_connection = Mock()
+        mock_connection.encrypted_refresh_token = "encrypted-refresh-token"
+        mock_connection.instance_url = "https://test.salesforce.com"
+        
+        with patch.object(salesforce_service, 'decrypt_token', return_value='mock-refresh-token'), \
+             patch.object(salesforce_service._http, 'post') as mock_post, \
+             patch.object(salesforce_service, 'Salesforce') as mock_sf, \
+             patch.dict(salesforce_service._access_token_cache, clear=True):
+            mock_post.return_value.json.return_value = {'access_token': 'mock-access-token'}
+            
+            salesforce_service.get_salesforce_api_client(mock_connection)
+            salesforce_service.get_salesforce_api_client(mock_connection)
+            
+            # Only the first call refreshes; both clients use the same token
+            mock_post.assert_called_once()
+            self.assertEqual(mock_sf.call_count, 2)
+            self.assertEqual(mock_sf.call_args.kwargs['session_id'], 'mock-access-token')
+            
+            # Refreshing after a rejected session skips the cache
+            salesforce_service.refresh_salesforce_api_client(mock_connection)
+            self.assertEqual(mock_post.call_count, 2)
+            
+            # Expired entries are dropped on lookup and pruned on store
+            salesforce_service._access_token_cache['stale-on-lookup'] = ('old-token', 0)
+            salesforce_service._access_token_cache['stale-elsewhere'] = ('old-token', 0)
+            stale_connection = Mock(encrypted_refresh_token='stale-on-lookup')
+            self.assertIsNone(salesforce_service._get_cached_access_token(stale_connection))
+            self.assertNotIn('stale-on-lookup', salesforce_service._access_token_cache)
+            salesforce_service.refresh_salesforce_api_client(mock_connection)
+            self.assertEqual(list(salesforce_service._access_token_cache), ['encrypted-refresh-token'])
+        print("✅ Access token reused within the cache TTL")
+        
+        # A check that hits an expired session renews the client once and retries
+        from simple_salesforce.exceptions import SalesforceExpiredSession
+        from app.services.health_checker_service import RevenueCloudHealthChecker
+        
+        expired_client = Mock()
+        expired_client.query.side_effect = SalesforceExpiredSession('url', 401, 'query', 'INVALID_SESSION_ID')
+        fresh_client = Mock()
+        fresh_client.query.return_value = {'totalSize': 0, 'records': []}
+        refresh_client = Mock(return_value=fresh_client)
+        
+        checker = RevenueCloudHealthChecker(expired_client, refresh_client=refresh_client)
+        self.assertEqual(checker._query('SELECT Id FROM Organization'), {'totalSize': 0, 'records': []})
+        refresh_client.assert_called_once()
+        print("✅ Expired sessions are refreshed once")
+    
+    def test_17_org_id_from_token_response(self):
+        """Test 17: Org ID is parsed from the token identity URL"""
+        print("\n🧪 Test 17: Org ID From Token Response")
+        
+        from app.services.salesforce_service import get_org_id_from_token_response
+        
+        token_response = {'id': 'https://login.salesforce.com/id/00D123456789ABC/005123456789ABC'}
+        self.assertEqual(get_org_id_from_token_response(token_response), '00D123456789ABC')
+        self.assertIsNone(get_org_id_from_token_response({}))
+        self.assertIsNone(get_org_id_from_token_response({'id': 'https://example.com/other'}))
+        print("✅ Org ID parsed without a userinfo call")
+    
+    def test_18_retry_after_cap(self):
+        """Test 18: Salesforce retries cap long Retry-After waits"""
+        print("\n🧪 Test 18: Retry-After Cap")
+        
+        from urllib3 import HTTPResponse
+        from app.services.salesforce_service import _http
+        
+        retry = _http.get_adapter('https://test.salesforce.com').max_retries
+        response = HTTPResponse(status=429, headers={'Retry-After': '120'})
+        self.assertEqual(retry.get_retry_after(response), 30)
+        
+        # Jittered exponential backoff is capped too
+        from urllib3.util.retry import RequestHistory
+        history = tuple(RequestHistory('GET', '/', None, 503, None) for _ in range(10))
+        self.assertLessEqual(retry.new(history=history).get_backoff_time(), 30)
+        print("✅ Retry waits stay under the worker timeout")
 
 def run_local_tests():
     """Run all local tests"""